@@ -1,8 +1,11 @@
 import argparse
-from typing import Optional
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
 
 import matplotlib
 import matplotlib.pyplot as plt
+import numba
 import numpy as np
 import seaborn as sns
 
@@ -11,14 +14,25 @@ import utils.common
 import utils.interface as interface
 import utils.synth
 
-matplotlib.use("Qt5Agg")
-
 sns.set_style("whitegrid")
 
 # Sample rate
 SAMPLE_RATE = 44100
 SMOOTH_SAMPLES = 500
 TAU = 2.0 * np.pi
+# Roughly a screen's width; plotting more points than this is wasted effort.
+PLOT_MAX_POINTS = 4000
+
+# Parameter paths used to set up the synth.
+EP_OSC1_ENABLE = interface.eparam_path("Osc1", "Enable")
+EP_OSC1_SHAPE = interface.eparam_path("Osc1", "Shape")
+EP_OSC2_ENABLE = interface.eparam_path("Osc2", "Enable")
+EP_FILT1_ENABLE = interface.eparam_path("Filt1", "Enable")
+EP_FILT2_ENABLE = interface.eparam_path("Filt2", "Enable")
+EP_AMP_ENV_ATTACK = interface.eparam_path("AmpEnv", "Attack")
+EP_AMP_ENV_SUSTAIN = interface.eparam_path("AmpEnv", "Sustain")
+EP_AMP_ENV_DECAY = interface.eparam_path("AmpEnv", "Decay")
+EP_AMP_ENV_RELEASE = interface.eparam_path("AmpEnv", "Release")
 
 
 # Default arguments
@@ -94,7 +108,17 @@ def main():
         help=f"Chunk size for rendering (default: {DEFAULT_CHUNK_SIZE})",
         default=DEFAULT_CHUNK_SIZE,
     )
+    parser.add_argument(
+        "--save",
+        type=str,
+        metavar="PATH",
+        help="Save the plot to PATH instead of showing it (uses the Agg backend).",
+    )
     args = parser.parse_args()
+
+    # Qt is only needed to show plots interactively; Agg is enough to save them.
+    matplotlib.use("Agg" if args.save else "Qt5Agg")
+
     if args.spectra:
         heatmap(
             shape=args.shape,
@@ -103,6 +127,7 @@ def main():
             note_end=args.note_end,
             smooth_samples=args.smooth,
             color_map=args.colormap,
+            save_path=args.save,
         )
     elif args.single:
         plot_waves(
@@ -113,6 +138,7 @@ def main():
             cut_start=args.cut_start,
             cut_end=args.cut_end,
             smooth_samples=args.smooth,
+            save_path=args.save,
         )
     else:
         print("No action specified")
@@ -137,6 +163,7 @@ def plot_waves(
     chunk_size: int,
     cut_start: Optional[int] = None,
     cut_end: Optional[int] = None,
+    save_path: Optional[str] = None,
 ):
 
     buf_len = int(time_sec * SAMPLE_RATE)
@@ -144,11 +171,9 @@ def plot_waves(
     # Create perfect Sine wave.
     freq = utils.common.freq_for(note)
 
-    # Create the time axis
-    ts = np.linspace(0.0, time_sec, buf_len)
-    ys = np.sin(TAU * freq * ts)
+    ys = np.sin((TAU * freq / SAMPLE_RATE) * np.arange(buf_len, dtype=np.float64))
 
-    _fig, axes = plt.subplots(nrows=2, ncols=1)
+    fig, axes = plt.subplots(nrows=2, ncols=1)
 
     synth = pysunfish.CoreWrapper(SAMPLE_RATE)
     initialize_synth(synth, shape)
@@ -171,18 +196,41 @@ def plot_waves(
     # Create the rendered sample.
     signal = utils.common.smooth_edges(signal, smooth_samples)
 
-    axes[0].plot(signal, alpha=0.6, color="r")
+    axes[0].plot(*_decimate(signal), alpha=0.6, color="r")
 
     amp = 1.0
     ys_plot = amp * utils.common.smooth_edges(ys[:plot_len], smooth_samples)
-    axes[0].plot(ys_plot, alpha=0.6, color="b")
+    axes[0].plot(*_decimate(ys_plot), alpha=0.6, color="b")
 
     # FFT below.
     xf, y_db = utils.common.fft(signal, SAMPLE_RATE)
     axes[1].plot(xf, y_db, color="b")
 
     plt.tight_layout()
-    plt.show()
+    _show_or_save(fig, save_path)
+
+
+def _show_or_save(fig: plt.Figure, save_path: Optional[str]) -> None:
+    if save_path is not None:
+        fig.savefig(save_path, dpi=100)
+    else:
+        plt.show()
+    plt.close(fig)
+
+
+def _decimate(ys: np.ndarray, target: int = PLOT_MAX_POINTS):
+    """Reduce to at most `target` points, keeping the original sample indices.
+
+    Each bucket contributes its min and max, so high notes are drawn as an
+    envelope rather than aliasing into a false, lower-frequency waveform.
+    """
+    step = max(1, -(-len(ys) // (target // 2)))
+    if step == 1:
+        return np.arange(len(ys)), ys
+    starts = np.arange(0, len(ys), step)
+    lo = np.minimum.reduceat(ys, starts)
+    hi = np.maximum.reduceat(ys, starts)
+    return np.repeat(starts, 2), np.column_stack((lo, hi)).ravel()
 
 
 def shape_float(shape: str) -> float:
@@ -204,6 +252,7 @@ def heatmap(
     note_end: int,
     smooth_samples: int,
     color_map: str,
+    save_path: Optional[str] = None,
 ) -> None:
     samples = int(length_sec * SAMPLE_RATE)
     chunk_size = 1024
@@ -222,60 +271,103 @@ def heatmap(
     else:
         raise ValueError(f"Unsupported shape: {shape}")
 
-    spectra = []
-    spectra_ideal = []
+    n_notes = note_end - note_start
+    ideal_sigs = np.empty((n_notes, samples))
+    rend_sigs = np.empty((n_notes, samples))
+
+    process_note = functools.partial(
+        _process_note,
+        shape=shape,
+        harmonics=harmonics,
+        samples=samples,
+        chunk_size=chunk_size,
+        smooth_samples=smooth_samples,
+    )
+    # Notes are independent, and render() holds the GIL, so fan out across processes.
+    with ProcessPoolExecutor(initializer=_init_worker, initargs=(shape,)) as ex:
+        results = ex.map(process_note, range(note_start, note_end))
+        for i, (ideal, rendered) in enumerate(results):
+            ideal_sigs[i] = ideal
+            rend_sigs[i] = rendered
+
+    # One batched FFT per matrix rather than one per note.
+    _xf, spectra_ideal = utils.common.fft(ideal_sigs, SAMPLE_RATE)
+    _xf, spectra = utils.common.fft(rend_sigs, SAMPLE_RATE)
+    spectra_ideal = spectra_ideal.T
+    spectra = spectra.T
 
-    # for note in tqdm(range(note_start, note_end)):
-    for note in range(note_start, note_end):
-        # Create perfect Sine wave.
-        freq = utils.common.freq_for(note)
+    fig, ax = plt.subplots(nrows=2, ncols=1)
 
-        # Create the time axis
-        ts = np.linspace(0.0, length_sec, samples)
-        signal = utils.synth.create_saw(
-            SAMPLE_RATE, samples, f0=freq, harmonics=harmonics
+    for axis, spectrum in ((ax[0], spectra_ideal), (ax[1], spectra)):
+        image = axis.imshow(
+            -np.abs(spectrum),
+            aspect="auto",
+            origin="lower",
+            cmap=color_map,
+            vmin=-130,
+            # Keep the image as a bitmap when exporting to vector formats.
+            rasterized=True,
         )
-        signal_smooth = utils.common.smooth_edges(signal, amt=smooth_samples)
-        xf, y_db = utils.common.fft(signal_smooth, SAMPLE_RATE)
-        spectra_ideal.append(y_db)
+        fig.colorbar(image, ax=axis)
+        axis.grid(False)
+    plt.tight_layout()
+    _show_or_save(fig, save_path)
+    del spectra, spectra_ideal
 
-        print(f"{samples=} {note=}")
 
-        synth = pysunfish.CoreWrapper(SAMPLE_RATE)
-        initialize_synth(synth, shape)
+# Per-process synth, created once by each worker in the heatmap pool.
+_worker_synth = None
 
-        synth.note_on(note)
-        l, _r = synth.render(chunk_size, samples, shape)
-        synth.note_off(note)
 
-        signal_smooth = utils.common.smooth_edges(signal, amt=smooth_samples)
-        xf, y_db = utils.common.fft(signal_smooth, SAMPLE_RATE)
-        spectra.append(y_db)
+def _init_worker(shape: str) -> None:
+    global _worker_synth
+    # The pool owns the parallelism; keep each worker's Numba kernels single-threaded.
+    numba.set_num_threads(1)
+    _worker_synth = pysunfish.CoreWrapper(SAMPLE_RATE)
+    initialize_synth(_worker_synth, shape)
 
-    spectra_ideal = np.array(spectra_ideal).T
-    spectra = np.array(spectra).T
 
-    fig, ax = plt.subplots(nrows=2, ncols=1)
-    cmap = sns.color_palette(color_map, as_cmap=True)
+def _process_note(
+    note: int,
+    shape: str,
+    harmonics: int,
+    samples: int,
+    chunk_size: int,
+    smooth_samples: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Render one note; returns the smoothed (ideal, rendered) signals."""
+    synth = _worker_synth
 
-    sns.heatmap(-np.abs(spectra_ideal), ax=ax[0], cmap=cmap, vmin=-130)
-    sns.heatmap(-np.abs(spectra), ax=ax[1], cmap=cmap, vmin=-130)
-    plt.tight_layout()
-    plt.show()
+    # Create perfect Sine wave.
+    freq = utils.common.freq_for(note)
+
+    signal = utils.synth.create_saw(SAMPLE_RATE, samples, f0=freq, harmonics=harmonics)
+    ideal = utils.common.smooth_edges(signal, amt=smooth_samples)
+
+    print(f"{samples=} {note=}")
+
+    synth.note_on(note)
+    l, _r = synth.render(chunk_size, samples, shape)
+    synth.note_off(note)
+    # Drop the releasing voice so it doesn't bleed into the next note.
+    synth.reset()
+
+    rendered = utils.common.smooth_edges(l, amt=smooth_samples)
+    return ideal, rendered
 
 
 def initialize_synth(synth, shape: str) -> None:
-    synth.update_param(interface.eparam_path("Osc1", "Enable"), 1.0)
-    synth.update_param(interface.eparam_path("Osc1", "Shape"), shape_float(shape))
-    synth.update_param(interface.eparam_path("Osc2", "Enable"), 0.0)
+    synth.update_param(EP_OSC1_ENABLE, 1.0)
+    synth.update_param(EP_OSC1_SHAPE, shape_float(shape))
+    synth.update_param(EP_OSC2_ENABLE, 0.0)
 
-    synth.update_param(interface.eparam_path("Filt1", "Enable"), 0.0)
-    synth.update_param(interface.eparam_path("Filt2", "Enable"), 0.0)
+    synth.update_param(EP_FILT1_ENABLE, 0.0)
+    synth.update_param(EP_FILT2_ENABLE, 0.0)
 
-    synth.update_param(interface.eparam_path("AmpEnv", "Attack"), 0.0)
-    synth.update_param(interface.eparam_path("AmpEnv", "Sustain"), 1.0)
-    synth.update_param(interface.eparam_path("AmpEnv", "Decay"), 1.0)
-    synth.update_param(interface.eparam_path("AmpEnv", "Release"), 1.0)
+    synth.update_param(EP_AMP_ENV_ATTACK, 0.0)
+    synth.update_param(EP_AMP_ENV_SUSTAIN, 1.0)
+    synth.update_param(EP_AMP_ENV_DECAY, 1.0)
+    synth.update_param(EP_AMP_ENV_RELEASE, 1.0)
 
 
 if __name__ == "__main__":
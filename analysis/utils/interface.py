@@ -1,3 +1,7 @@
+import functools
+
+
+@functools.lru_cache(maxsize=256)
 def eparam_path(*elms: str) -> str:
     """Convert EParam paths to JSON.
 
@@ -7,11 +11,4 @@ def eparam_path(*elms: str) -> str:
     Returns:
         JSON string.
     """
-    start = ""
-    end = ""
-
-    for elm in elms:
-        start += f"""{{"{elm}": """
-        end += "}"
-    result = start + "null" + end
-    return result
+    return "".join(f'{{"{elm}": ' for elm in elms) + "null" + "}" * len(elms)
@@ -1,21 +1,8 @@
-from typing import Optional
+import math
+from typing import Optional, Tuple
 
-import attr
 import numpy as np
-
-
-def get_amp(harmonic: int) -> float:
-    if harmonic % 2 == 0:
-        return -1.0
-    else:
-        return 1.0
-
-
-@attr.dataclass(frozen=True)
-class FreqComponent:
-    freq: float
-    amp: float
-    divisor: float
+from numba import njit, prange
 
 
 TAU = 2.0 * np.pi
@@ -35,26 +22,38 @@ def create_saw(
         harmonics: Number of sawtooth harmonics.
         cut_at: Frequency to cut off. Defaults to Nyquist.
     """
-    components = [
-        FreqComponent(freq=i * f0, amp=get_amp(i), divisor=float(i))
-        for i in range(1, harmonics + 1)
-    ]
-
     nyquist = sample_rate / 2.0
     cut_at = cut_at or nyquist
 
-    dt = 1.0 / sample_rate
-    time = 0.0
+    amps, divisors = _saw_components(f0, harmonics, cut_at)
 
-    out = np.zeros(n)
-    for i in range(n):
+    out = np.empty(n)
+    _saw_kernel(out, float(f0), amps / divisors, float(sample_rate), int(n))
+    return out
+
+
+def _saw_components(
+    f0: float, harmonics: int, cut_at: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sawtooth partials below `cut_at`, as parallel (amps, divisors) arrays."""
+    k = np.arange(1, harmonics + 1, dtype=np.float64)
+    amps = 1.0 - 2.0 * (k % 2 == 0)
+    mask = k * f0 < cut_at
+    return amps[mask], k[mask]
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _saw_kernel(out, f0, amps_over_div, sample_rate, n):
+    # Partials are consecutive harmonics of f0, so instead of one sin() per partial,
+    # step through them with the Chebyshev recurrence:
+    #   sin(k*theta) = 2*cos(theta)*sin((k-1)*theta) - sin((k-2)*theta)
+    for i in prange(n):
+        theta = TAU * f0 * (i / sample_rate)
+        two_cos = 2.0 * math.cos(theta)
+        sin_prev = 0.0
+        sin_curr = math.sin(theta)
         v = 0.0
-        for freq_component in components:
-            if freq_component.freq >= cut_at:
-                continue
-            v += freq_component.amp * (
-                np.sin(TAU * freq_component.freq * time) / freq_component.divisor
-            )
+        for h in range(amps_over_div.size):
+            v += amps_over_div[h] * sin_curr
+            sin_prev, sin_curr = sin_curr, two_cos * sin_curr - sin_prev
         out[i] = v
-        time += dt
-    return out
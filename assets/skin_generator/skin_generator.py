@@ -1,6 +1,7 @@
 # Helper to auto-generate the GUI RON file.
 
-from typing import Union, TextIO, Tuple
+import functools
+from typing import List, Union, Tuple
 
 import attr
 
@@ -14,6 +15,7 @@ class ScreenMetrics:
 # Standalone, big:
 # TODO: Extract Sprite width & height from PNG directly.
 SPRITE_WIDTH, SPRITE_HEIGHT = 1500, 997
+_SPRITE_RATIO = SPRITE_HEIGHT / SPRITE_WIDTH
 
 UI_SCALE = 1.0
 WIDTH, HEIGHT = int(SPRITE_WIDTH * UI_SCALE), int(SPRITE_HEIGHT * UI_SCALE)
@@ -57,17 +59,18 @@ class Rect:
     x2: NumLike
     y2: NumLike
 
+    # Rects are frozen (and hashable); sprite rects are shared across panels.
+    @functools.lru_cache(maxsize=None)
     def to_str(self) -> str:
         return (
             f"Rect(pos: ({self.x1:.6f}, {self.y1:.6f}, {self.x2:.6f}, {self.y2:.6f}))"
         )
 
     def normalized(self, screen: ScreenMetrics) -> str:
-        ratio = SPRITE_HEIGHT / SPRITE_WIDTH
         nx1 = self.x1 / screen.width
         nx2 = self.x2 / screen.width
-        ny1 = (self.y1 * ratio) / screen.height
-        ny2 = (self.y2 * ratio) / screen.height
+        ny1 = (self.y1 * _SPRITE_RATIO) / screen.height
+        ny2 = (self.y2 * _SPRITE_RATIO) / screen.height
         return f"Rect(pos: ({nx1:.6f}, {ny1:.6f}, {nx2:.6f}, {ny2:.6f}))"
 
     @classmethod
@@ -77,7 +80,7 @@ class Rect:
         return Rect(x, y, x + width, y + height)
 
 
-def create_osc_panel(screen: ScreenMetrics, out: TextIO, osc: int) -> None:
+def create_osc_panel(screen: ScreenMetrics, parts: List[str], osc: int) -> None:
     x_offset = 740 * (osc - 1)
     on_off_rect = Rect.from_offset(x_offset + 50, 35, 43, 31)
     shape_rect = Rect.from_offset(x_offset + 144, 136, 201, 33)
@@ -99,7 +102,7 @@ def create_osc_panel(screen: ScreenMetrics, out: TextIO, osc: int) -> None:
         return rect.normalized(screen)
 
     # Panel
-    out.write(
+    parts.append(
         f"""
         // // OSC {osc} Panel
         Toggle(
@@ -175,7 +178,7 @@ def create_osc_panel(screen: ScreenMetrics, out: TextIO, osc: int) -> None:
     )
 
 
-def create_filt_panel(screen: ScreenMetrics, out: TextIO, filt: int) -> None:
+def create_filt_panel(screen: ScreenMetrics, parts: List[str], filt: int) -> None:
     x_offset = 740 * (filt - 1)
     on_off_rect = Rect.from_offset(x_offset + 50, 423, 43, 31)
     mode_rect = Rect.from_offset(x_offset + 135, 537, 201, 33)
@@ -192,7 +195,7 @@ def create_filt_panel(screen: ScreenMetrics, out: TextIO, filt: int) -> None:
     def emit(rect: Rect) -> str:
         return rect.normalized(screen)
 
-    out.write(
+    parts.append(
         f"""
         // Filter {filt} Panel
         Toggle(
@@ -239,7 +242,7 @@ def create_filt_panel(screen: ScreenMetrics, out: TextIO, filt: int) -> None:
     )
 
 
-def create_lfo_panel(screen: ScreenMetrics, out: TextIO, lfo: int) -> None:
+def create_lfo_panel(screen: ScreenMetrics, parts: List[str], lfo: int) -> None:
     x_offset = 373 * (lfo - 1)
     target_rect = Rect.from_offset(x_offset + 103, 788, 220, 33)
     shape_rect = Rect.from_offset(x_offset + 103, 827, 220, 33)
@@ -249,7 +252,7 @@ def create_lfo_panel(screen: ScreenMetrics, out: TextIO, lfo: int) -> None:
     def emit(rect: Rect) -> str:
         return rect.normalized(screen)
 
-    out.write(
+    parts.append(
         f"""
         // LFO{lfo}
         // TODO: Button for Synced
@@ -289,7 +292,7 @@ def create_lfo_panel(screen: ScreenMetrics, out: TextIO, lfo: int) -> None:
     )
 
 
-def create_adsr_panel(screen: ScreenMetrics, out: TextIO, adsr: int) -> None:
+def create_adsr_panel(screen: ScreenMetrics, parts: List[str], adsr: int) -> None:
     x_offset = 369 * (adsr - 1)
     attack_rect = Rect.from_offset(x_offset + 818, 790, 32, 123)
     decay_rect = Rect.from_offset(x_offset + 876, 790, 32, 123)
@@ -304,7 +307,7 @@ def create_adsr_panel(screen: ScreenMetrics, out: TextIO, adsr: int) -> None:
         return rect.normalized(screen)
 
     # Panel
-    out.write(
+    parts.append(
         f"""
             // ADSR {name} Panel
             VSlider(
@@ -342,39 +345,42 @@ def create_adsr_panel(screen: ScreenMetrics, out: TextIO, adsr: int) -> None:
 def main() -> None:
     screen = METRICS
 
-    with open("output.ron", "w") as file:
-        file.write("(\n")
-        file.write("""stylesheet_image: Some("synth4_background.png"),\n""")
-        file.write(f"size: ({WIDTH}, {HEIGHT}),\n")
-        file.write(f"padding: ({DEFAULT_PADDING_X}, {DEFAULT_PADDING_Y}),\n")
-
-        r, g, b = BACKGROUND_COLOR
-        # file.write(f"background: Solid(color: Color(r: {r}, g: {g}, b: {b})),\n")
-
-        # Normalize sprite height & width
-        if SPRITE_HEIGHT > SPRITE_WIDTH:
-            normalized_height = 1.0
-            normalized_width = SPRITE_WIDTH / SPRITE_HEIGHT
-        else:
-            normalized_height = SPRITE_HEIGHT / SPRITE_WIDTH
-            normalized_width = 1.0
-
-        bg_dst = Rect(0, 0, normalized_width, normalized_height)
-        bg_src = Rect(0, 0, SPRITE_WIDTH, SPRITE_HEIGHT)
-        file.write(
-            f"background: Sprite(dest_rect: {bg_dst.to_str()}, src_rect: {bg_src.to_str()}),\n"
-        )
+    parts: List[str] = []
+    parts.append("(\n")
+    parts.append("""stylesheet_image: Some("synth4_background.png"),\n""")
+    parts.append(f"size: ({WIDTH}, {HEIGHT}),\n")
+    parts.append(f"padding: ({DEFAULT_PADDING_X}, {DEFAULT_PADDING_Y}),\n")
+
+    r, g, b = BACKGROUND_COLOR
+    # parts.append(f"background: Solid(color: Color(r: {r}, g: {g}, b: {b})),\n")
+
+    # Normalize sprite height & width
+    if SPRITE_HEIGHT > SPRITE_WIDTH:
+        normalized_height = 1.0
+        normalized_width = SPRITE_WIDTH / SPRITE_HEIGHT
+    else:
+        normalized_height = SPRITE_HEIGHT / SPRITE_WIDTH
+        normalized_width = 1.0
 
-        file.write(" elements: [\n")
-        create_osc_panel(screen, file, 1)
-        create_osc_panel(screen, file, 2)
-        create_filt_panel(screen, file, 1)
-        create_filt_panel(screen, file, 2)
-        create_adsr_panel(screen, file, 1)
-        create_adsr_panel(screen, file, 2)
-        create_lfo_panel(screen, file, 1)
-        create_lfo_panel(screen, file, 2)
-        file.write("])\n")
+    bg_dst = Rect(0, 0, normalized_width, normalized_height)
+    bg_src = Rect(0, 0, SPRITE_WIDTH, SPRITE_HEIGHT)
+    parts.append(
+        f"background: Sprite(dest_rect: {bg_dst.to_str()}, src_rect: {bg_src.to_str()}),\n"
+    )
+
+    parts.append(" elements: [\n")
+    create_osc_panel(screen, parts, 1)
+    create_osc_panel(screen, parts, 2)
+    create_filt_panel(screen, parts, 1)
+    create_filt_panel(screen, parts, 2)
+    create_adsr_panel(screen, parts, 1)
+    create_adsr_panel(screen, parts, 2)
+    create_lfo_panel(screen, parts, 1)
+    create_lfo_panel(screen, parts, 2)
+    parts.append("])\n")
+
+    with open("output.ron", "w") as file:
+        file.write("".join(parts))
 
 
 if __name__ == "__main__":
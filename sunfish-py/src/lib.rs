@@ -67,6 +67,13 @@ impl CoreWrapper {
         Ok(())
     }
 
+    /// Drop all voices, including any still in their release stage.
+    fn reset(&mut self) -> PyResult<()> {
+        self.inst.voices.clear();
+        self.inst.active_voices = 0;
+        Ok(())
+    }
+
     fn render(
         &mut self,
         py: Python,